@@ -5,12 +5,18 @@ State-of-the-art well log analysis with comprehensive lithology identification,
 rock property calculations, and advanced interpretation algorithms.
 """
 
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Off-screen rendering; figures are saved to disk
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats, optimize
-from sklearn.cluster import KMeans
+from scipy.spatial import cKDTree
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 import warnings
 warnings.filterwarnings('ignore')
@@ -21,6 +27,44 @@ except ImportError:
     print("Warning: lasio not available. Install with: pip install lasio")
     lasio = None
 
+# Reservoir-quality porosity cutoffs (fraction, i.e. 5/10/15%); classes are right-closed:
+# <=0.05, 0.05-0.10, 0.10-0.15, >0.15. float32 to match the computed porosity curves.
+_QUALITY_BINS = np.array([0.05, 0.10, 0.15], dtype=np.float32)
+_QUALITY_LABELS = np.array(['Poor', 'Fair', 'Good', 'Excellent', 'No Data'])
+
+# Report block for the class percentages, best class first
+_QUAL_TEMPLATE = ("Excellent (>15%): {:.1f}%\n"
+                  "Good (10-15%): {:.1f}%\n"
+                  "Fair (5-10%): {:.1f}%\n"
+                  "Poor (<5%): {:.1f}%\n")
+
+
+def _classify_porosity(phi):
+    """Reservoir-quality label per sample from fractional porosity."""
+    codes = np.searchsorted(_QUALITY_BINS, phi)
+    codes[np.isnan(phi)] = len(_QUALITY_LABELS) - 1
+    return _QUALITY_LABELS[codes]
+
+
+def _fast_mean(s):
+    """Mean of a Series or array on its raw values, skipping NaN only when present."""
+    arr = np.asarray(s)
+    return np.nanmean(arr) if np.isnan(arr).any() else arr.mean()
+
+
+def _summarize(phi, sw=None, k=None):
+    """(mean porosity, quality-class counts, mean Sw, mean k) for generate_report."""
+    valid = phi[~np.isnan(phi)]
+    counts = np.bincount(np.searchsorted(_QUALITY_BINS, valid), minlength=len(_QUALITY_BINS) + 1)
+    return (_fast_mean(phi), counts,
+            np.nan if sw is None else _fast_mean(sw),
+            np.nan if k is None else _fast_mean(k))
+
+
+# Where generate_report writes unless told otherwise
+_DEFAULT_REPORT = '/Users/reuben/well/Murphy1_Analysis_Report.txt'
+
+
 class PetrophysicalAnalyzer:
     """Advanced petrophysical analysis of well log data."""
     
@@ -31,6 +75,10 @@ class PetrophysicalAnalyzer:
         self.df = None
         self.well_info = {}
         self.curves = {}
+        self._numeric_cols = []
+        self._col_set = set()
+        self._depth = None
+        self._depth_min = self._depth_max = None
         
     def load_las_file(self):
         """Load and parse LAS file with comprehensive error handling."""
@@ -43,9 +91,15 @@ class PetrophysicalAnalyzer:
                 self.df = self.las.df()
                 self.well_info = dict(self.las.well)
                 self.curves = {curve.mnemonic: curve for curve in self.las.curves}
+            
+            self._optimize_dtypes()
+            self._numeric_cols = list(self.df.select_dtypes(include=[np.number]).columns)
+            self._col_set = set(self.df.columns)
+            self._depth = np.ascontiguousarray(self.df.index.to_numpy(), dtype=np.float32)
+            self._depth_min, self._depth_max = self._depth.min(), self._depth.max()
                 
             print(f"✅ Successfully loaded LAS file: {self.las_file_path}")
-            print(f"📊 Data range: {self.df.index.min():.1f} to {self.df.index.max():.1f} ft")
+            print(f"📊 Data range: {self._depth_min:.1f} to {self._depth_max:.1f} ft")
             print(f"📈 Available curves: {list(self.df.columns)}")
             return True
             
@@ -53,45 +107,74 @@ class PetrophysicalAnalyzer:
             print(f"❌ Error loading LAS file: {e}")
             return False
     
-    def _manual_las_parse(self):
+    def _optimize_dtypes(self):
+        """Downcast curves and depth index to float32 to halve memory traffic."""
+        float_cols = self.df.select_dtypes(include=['floating']).columns
+        self.df[float_cols] = self.df[float_cols].astype(np.float32)
+        self.df.index = self.df.index.astype(np.float32)
+        
+        # Column-major block: each curve is one contiguous buffer
+        if len(float_cols) == len(self.df.columns):
+            self.df = pd.DataFrame(np.asfortranarray(self.df.to_numpy()), index=self.df.index,
+                                   columns=self.df.columns, copy=False)
+    
+    def _manual_las_parse(self, chunk_rows=4096):
         """Manual LAS parsing when lasio is not available."""
-        with open(self.las_file_path, 'r') as f:
-            lines = f.readlines()
-        
-        # Find ASCII data section
-        data_start = None
         header_info = {}
         curves = []
-        
-        for i, line in enumerate(lines):
-            if line.strip().startswith('~ASCII') or line.strip().startswith('~A'):
-                data_start = i + 1
-                break
-            elif line.strip().startswith('DEPT'):
-                # Parse curve names from header
-                parts = line.strip().split()
-                if len(parts) > 0:
-                    curves = parts
-        
-        if data_start and curves:
-            # Read data
-            data_lines = [line.strip() for line in lines[data_start:] if line.strip() and not line.startswith('#')]
-            data = []
-            
-            for line in data_lines:
-                values = line.split()
-                if len(values) == len(curves):
-                    try:
-                        row = [float(v) if v != '-999.250000' else np.nan for v in values]
-                        data.append(row)
-                    except ValueError:
-                        continue
-            
-            if data:
-                self.df = pd.DataFrame(data, columns=curves)
-                self.df.set_index(curves[0], inplace=True)  # First column as depth index
-                self.df.replace(-999.25, np.nan, inplace=True)
-                print("📋 Manual LAS parsing completed")
+        section = None
+
+        # Binary handle with a large buffer; the data block is handed to the C parser as bytes
+        with open(self.las_file_path, 'rb', buffering=1 << 20) as f:
+            # Stream header sections up to the ASCII data marker
+            for line in f:
+                stripped = line.decode('latin-1').strip()
+                if stripped.startswith('~'):
+                    section = stripped[1:2].upper()
+                    if section == 'A':
+                        break
+                elif stripped and not stripped.startswith('#'):
+                    # Mnemonic is everything before the first period
+                    mnemonic, _, rest = stripped.partition('.')
+                    mnemonic = mnemonic.strip()
+                    if section == 'C':
+                        curves.append(mnemonic)
+                    elif section == 'W' and mnemonic in ('STRT', 'STOP', 'STEP', 'NULL'):
+                        try:
+                            header_info[mnemonic] = float(rest.split(':', 1)[0].split()[-1])
+                        except (IndexError, ValueError):
+                            pass
+
+            if section != 'A' or not curves:
+                return
+
+            # Pre-allocate the curve matrix from the depth range in the header; without a
+            # complete STRT/STOP/STEP range the buffer starts empty and grows per chunk
+            nrows = 0
+            if header_info.get('STEP') and 'STRT' in header_info and 'STOP' in header_info:
+                nrows = int(round((header_info['STOP'] - header_info['STRT']) / header_info['STEP'])) + 1
+            arr = np.empty((max(nrows, 0), len(curves)), dtype=np.float32)
+
+            # Fill it in bounded chunks straight from the open file handle
+            filled = 0
+            reader = pd.read_csv(f, sep=r'\s+', header=None, names=curves, comment='#',
+                                 dtype=np.float32, engine='c', chunksize=chunk_rows,
+                                 encoding='latin-1')
+            for chunk in reader:
+                n = len(chunk)
+                if filled + n > len(arr):
+                    grown = np.empty((max(2 * len(arr), filled + n), len(curves)), dtype=np.float32)
+                    grown[:filled] = arr[:filled]
+                    arr = grown
+                arr[filled:filled + n] = chunk.to_numpy()
+                filled += n
+
+        arr = arr[:filled]
+        arr[arr == np.float32(header_info.get('NULL', -999.25))] = np.nan
+
+        self.df = pd.DataFrame(arr[:, 1:], index=pd.Index(arr[:, 0], name=curves[0]),
+                               columns=curves[1:], copy=False)  # First column as depth index
+        print("📋 Manual LAS parsing completed")
     
     def data_quality_assessment(self):
         """Comprehensive data quality assessment."""
@@ -100,151 +183,156 @@ class PetrophysicalAnalyzer:
         
         # Basic statistics
         total_points = len(self.df)
-        depth_range = self.df.index.max() - self.df.index.min()
+        depth_range = self._depth_max - self._depth_min
         
         print(f"Total data points: {total_points:,}")
-        print(f"Depth range: {self.df.index.min():.1f} to {self.df.index.max():.1f} ft ({depth_range:.1f} ft)")
-        print(f"Sample interval: {np.median(np.diff(self.df.index)):.2f} ft")
+        print(f"Depth range: {self._depth_min:.1f} to {self._depth_max:.1f} ft ({depth_range:.1f} ft)")
+        print(f"Sample interval: {np.median(np.diff(self._depth)):.2f} ft")
         
         # Null value analysis
         print("\n📊 DATA COMPLETENESS BY CURVE:")
-        for col in self.df.columns:
-            valid_count = self.df[col].count()
+        valid_counts = self.df.count()
+        for col, valid_count in valid_counts.items():
             completeness = (valid_count / total_points) * 100
             print(f"{col:<8}: {valid_count:>6,} points ({completeness:>5.1f}% complete)")
         
         # Identify outliers using IQR method
         print("\n⚠️  OUTLIER DETECTION:")
-        for col in self.df.select_dtypes(include=[np.number]).columns:
-            Q1 = self.df[col].quantile(0.25)
-            Q3 = self.df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = ((self.df[col] < (Q1 - 1.5 * IQR)) | 
-                       (self.df[col] > (Q3 + 1.5 * IQR))).sum()
+        numeric = self.df[self._numeric_cols]
+        q = numeric.quantile([.25, .75])  # Both quartiles for every curve in one call
+        Q1, Q3 = q.loc[.25], q.loc[.75]
+        IQR = Q3 - Q1
+        outlier_counts = ((numeric < (Q1 - 1.5 * IQR)) | 
+                          (numeric > (Q3 + 1.5 * IQR))).sum()
+        for col, outliers in outlier_counts.items():
             if outliers > 0:
-                print(f"{col:<8}: {outliers:>6} outliers ({outliers/self.df[col].count()*100:.1f}%)")
+                print(f"{col:<8}: {outliers:>6} outliers ({outliers/valid_counts[col]*100:.1f}%)")
     
     def lithology_identification(self):
         """Advanced lithology identification using multiple methods."""
         print("\n🗿 LITHOLOGY IDENTIFICATION")
         print("="*50)
         
-        results = {}
+        tasks = {}
         
         # Method 1: Gamma Ray based classification
-        if 'GGCE' in self.df.columns:
+        if 'GGCE' in self._col_set:
             gr_col = 'GGCE'
-        elif 'GR' in self.df.columns:
+        elif 'GR' in self._col_set:
             gr_col = 'GR'
         else:
             gr_col = None
             
         if gr_col:
-            results['gamma_ray'] = self._gamma_ray_lithology(gr_col)
+            tasks['gamma_ray'] = (self._gamma_ray_lithology, (gr_col,))
         
         # Method 2: Neutron-Density cross-plot analysis
-        if 'NPRL' in self.df.columns and 'DEN' in self.df.columns:
-            results['neutron_density'] = self._neutron_density_lithology('NPRL', 'DEN')
+        if 'NPRL' in self._col_set and 'DEN' in self._col_set:
+            tasks['neutron_density'] = (self._neutron_density_lithology, ('NPRL', 'DEN'))
         
         # Method 3: PE (Photoelectric Factor) analysis
-        if 'PDPE' in self.df.columns:
-            results['photoelectric'] = self._photoelectric_lithology('PDPE')
+        if 'PDPE' in self._col_set:
+            tasks['photoelectric'] = (self._photoelectric_lithology, ('PDPE',))
         
         # Method 4: Machine Learning clustering
-        if len(self.df.select_dtypes(include=[np.number]).columns) >= 3:
-            results['ml_clustering'] = self._ml_lithology_clustering()
+        if len(self._numeric_cols) >= 3:
+            tasks['ml_clustering'] = (self._ml_lithology_clustering, ())
+        
+        # Methods read disjoint columns, so run them concurrently; each prints into its
+        # own buffer, replayed in method order once all have finished
+        buffers = {name: io.StringIO() for name in tasks}
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            futures = {name: ex.submit(fn, *args, out=buffers[name])
+                       for name, (fn, args) in tasks.items()}
+            results = {name: fut.result() for name, fut in futures.items()}
+        
+        for buf in buffers.values():
+            print(buf.getvalue(), end='')
         
         return results
     
-    def _gamma_ray_lithology(self, gr_col):
+    def _gamma_ray_lithology(self, gr_col, out=None):
         """Lithology from Gamma Ray using Larionov method."""
-        gr_data = self.df[gr_col].dropna()
+        gr = self.df[gr_col].to_numpy()
+        mask = ~np.isnan(gr)
+        gr_valid = gr[mask]
+        idx = self.df.index[mask]
         
-        # Define cutoffs (can be calibrated based on local geology)
-        gr_clean = gr_data.quantile(0.05)  # Clean sand baseline
-        gr_shale = gr_data.quantile(0.95)  # Pure shale
+        # Define cutoffs (can be calibrated based on local geology); nanquantile on the
+        # full curve gives NaN rather than raising when the log has no valid samples
+        gr_clean = np.nanquantile(gr, 0.05)  # Clean sand baseline
+        gr_shale = np.nanquantile(gr, 0.95)  # Pure shale
         
         # Larionov equation for shale volume
-        gr_normalized = (gr_data - gr_clean) / (gr_shale - gr_clean)
-        gr_normalized = gr_normalized.clip(0, 1)
+        gr_normalized = (gr_valid - gr_clean) / (gr_shale - gr_clean)
+        np.clip(gr_normalized, 0, 1, out=gr_normalized)
         
         # Tertiary rocks (Larionov, 1969)
         v_shale_tertiary = 0.083 * (2**(3.7 * gr_normalized) - 1)
         
-        # Older rocks (Larionov, 1969)
-        v_shale_older = 0.33 * (2**(2 * gr_normalized) - 1)
+        # Classification: <0.15 clean, 0.15-0.50 shaly, >=0.50 shale
+        codes = np.digitize(v_shale_tertiary, [0.15, 0.50])
+        lithology = pd.Series(pd.Categorical.from_codes(
+            codes, categories=['Clean Sandstone', 'Shaly Sandstone', 'Shale']), index=idx)
         
-        # Classification
-        lithology = pd.Series(index=gr_data.index, dtype='object')
-        lithology[v_shale_tertiary < 0.15] = 'Clean Sandstone'
-        lithology[(v_shale_tertiary >= 0.15) & (v_shale_tertiary < 0.50)] = 'Shaly Sandstone'
-        lithology[v_shale_tertiary >= 0.50] = 'Shale'
-        
-        print(f"Gamma Ray Analysis ({gr_col}):")
-        print(f"  Clean sand GR: {gr_clean:.1f} GAPI")
-        print(f"  Pure shale GR: {gr_shale:.1f} GAPI")
-        print(f"  Lithology distribution:")
-        for lith, count in lithology.value_counts().items():
-            percentage = (count / len(lithology)) * 100
-            print(f"    {lith}: {percentage:.1f}%")
+        print(f"Gamma Ray Analysis ({gr_col}):", file=out)
+        print(f"  Clean sand GR: {gr_clean:.1f} GAPI", file=out)
+        print(f"  Pure shale GR: {gr_shale:.1f} GAPI", file=out)
+        print(f"  Lithology distribution:", file=out)
+        self._print_lith_dist(lithology, indent='    ', out=out)
         
         return {
             'lithology': lithology,
-            'v_shale_tertiary': v_shale_tertiary,
-            'v_shale_older': v_shale_older,
+            'v_shale_tertiary': pd.Series(v_shale_tertiary, index=idx),
             'gr_clean': gr_clean,
             'gr_shale': gr_shale
         }
     
-    def _neutron_density_lithology(self, nphi_col, rhob_col):
+    def _neutron_density_lithology(self, nphi_col, rhob_col, out=None):
         """Neutron-Density cross-plot lithology identification."""
-        valid_data = self.df[[nphi_col, rhob_col]].dropna()
+        nphi_arr = self.df[nphi_col].to_numpy()
+        rhob_arr = self.df[rhob_col].to_numpy()
+        mask = ~(np.isnan(nphi_arr) | np.isnan(rhob_arr))
         
-        if len(valid_data) == 0:
+        if not mask.any():
             return None
             
-        nphi = valid_data[nphi_col] / 100  # Convert to fraction if in percentage
-        rhob = valid_data[rhob_col]
-        
-        # Matrix points (typical values)
-        matrices = {
-            'Sandstone': {'nphi': 0.0, 'rhob': 2.65},
-            'Limestone': {'nphi': 0.0, 'rhob': 2.71},
-            'Dolomite': {'nphi': 0.0, 'rhob': 2.87},
-            'Anhydrite': {'nphi': 0.0, 'rhob': 2.96}
-        }
-        
-        # Calculate distances to matrix points
-        lithology = pd.Series(index=valid_data.index, dtype='object')
-        
-        for idx in valid_data.index:
-            distances = {}
-            for matrix, props in matrices.items():
-                dist = np.sqrt((nphi[idx] - props['nphi'])**2 + 
-                              (rhob[idx] - props['rhob'])**2 * 0.1)  # Weight density less
-                distances[matrix] = dist
-            
-            # Assign closest matrix
-            lithology[idx] = min(distances.keys(), key=lambda k: distances[k])
-            
-            # Gas effect detection (low density, low neutron)
-            if rhob[idx] < 2.3 and nphi[idx] < 0.15:
-                lithology[idx] = 'Gas Sand'
-        
-        print(f"\nNeutron-Density Analysis:")
-        for lith, count in lithology.value_counts().items():
-            percentage = (count / len(lithology)) * 100
-            print(f"  {lith}: {percentage:.1f}%")
+        idx = self.df.index[mask]
+        nphi_arr = nphi_arr[mask] / 100  # Convert to fraction if in percentage
+        rhob_arr = rhob_arr[mask]
+        
+        # Matrix points (typical values): Sandstone, Limestone, Dolomite, Anhydrite
+        names = np.array(['Sandstone', 'Limestone', 'Dolomite', 'Anhydrite', 'Gas Sand'])
+        mx = np.array([0.0, 0.0, 0.0, 0.0])
+        my = np.array([2.65, 2.71, 2.87, 2.96])
+
+        # Scale density by sqrt(0.1) so Euclidean distance weights density less
+        w = np.sqrt(0.1)
+        tree = cKDTree(np.column_stack([mx, my * w]))
+
+        # Assign closest matrix
+        _, codes = tree.query(np.column_stack([nphi_arr, rhob_arr * w]), k=1)
+
+        # Gas effect detection (low density, low neutron)
+        codes[(rhob_arr < 2.3) & (nphi_arr < 0.15)] = len(names) - 1
+
+        lithology = pd.Series(pd.Categorical.from_codes(codes, categories=names), index=idx)
+
+        print(f"\nNeutron-Density Analysis:", file=out)
+        self._print_lith_dist(lithology, out=out)
         
         return {
             'lithology': lithology,
-            'nphi_data': nphi,
-            'rhob_data': rhob
+            'nphi_data': pd.Series(nphi_arr, index=idx),
+            'rhob_data': pd.Series(rhob_arr, index=idx)
         }
     
-    def _photoelectric_lithology(self, pe_col):
+    def _photoelectric_lithology(self, pe_col, out=None):
         """Lithology identification using Photoelectric Factor."""
-        pe_data = self.df[pe_col].dropna()
+        pe = self.df[pe_col].to_numpy()
+        mask = ~np.isnan(pe)
+        pe = pe[mask]
+        idx = self.df.index[mask]
         
         # PE values for common minerals
         pe_ranges = {
@@ -256,35 +344,36 @@ class PetrophysicalAnalyzer:
             'Salt': (4.6, 4.8)
         }
         
-        lithology = pd.Series(index=pe_data.index, dtype='object')
+        conds = [(pe >= pe_min) & (pe <= pe_max) for pe_min, pe_max in pe_ranges.values()]
         
-        for mineral, (pe_min, pe_max) in pe_ranges.items():
-            mask = (pe_data >= pe_min) & (pe_data <= pe_max)
-            lithology[mask] = mineral
+        # Later ranges take precedence where they overlap, so select in reverse;
+        # unidentified values fall through to the trailing 'Unknown' category
+        codes = np.select(conds[::-1], np.arange(len(pe_ranges))[::-1], default=len(pe_ranges))
         
-        # Unidentified values
-        lithology[lithology.isnull()] = 'Unknown'
+        lithology = pd.Series(pd.Categorical.from_codes(
+            codes, categories=[*pe_ranges, 'Unknown']), index=idx)
         
-        print(f"\nPhotoelectric Factor Analysis:")
-        for lith, count in lithology.value_counts().items():
-            percentage = (count / len(lithology)) * 100
-            print(f"  {lith}: {percentage:.1f}%")
+        print(f"\nPhotoelectric Factor Analysis:", file=out)
+        self._print_lith_dist(lithology, out=out)
         
-        return {'lithology': lithology, 'pe_data': pe_data}
+        return {'lithology': lithology, 'pe_data': pd.Series(pe, index=idx)}
     
-    def _ml_lithology_clustering(self):
+    def _ml_lithology_clustering(self, out=None):
         """Machine learning based lithology clustering."""
         # Select relevant curves for clustering
         analysis_curves = []
         for curve in ['GGCE', 'NPRL', 'DEN', 'PDPE', 'RTAT']:
-            if curve in self.df.columns:
+            if curve in self._col_set:
                 analysis_curves.append(curve)
         
         if len(analysis_curves) < 2:
             return None
         
         # Prepare data
-        ml_data = self.df[analysis_curves].dropna()
+        ml_data = self.df[analysis_curves].to_numpy()
+        mask = ~np.isnan(ml_data).any(axis=1)
+        ml_data = ml_data[mask]
+        idx = self.df.index[mask]
         if len(ml_data) < 10:
             return None
         
@@ -293,29 +382,28 @@ class PetrophysicalAnalyzer:
         scaled_data = scaler.fit_transform(ml_data)
         
         # Determine optimal number of clusters using elbow method
-        inertias = []
+        models = {}
         k_range = range(2, min(8, len(ml_data)//5))
         
         for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=42)
-            kmeans.fit(scaled_data)
-            inertias.append(kmeans.inertia_)
+            models[k] = MiniBatchKMeans(n_clusters=k, random_state=42, batch_size=1024,
+                                        n_init=3).fit(scaled_data)
+        inertias = [models[k].inertia_ for k in k_range]
         
         # Simple elbow detection
         optimal_k = k_range[np.argmax(np.diff(np.diff(inertias)))] if len(inertias) > 2 else 3
         
-        # Final clustering
-        kmeans = KMeans(n_clusters=optimal_k, random_state=42)
-        clusters = kmeans.fit_predict(scaled_data)
+        # Final clustering (reuse the sweep model when available)
+        kmeans = models.get(optimal_k)
+        if kmeans is None:
+            kmeans = KMeans(n_clusters=optimal_k, random_state=42).fit(scaled_data)
+        clusters = kmeans.labels_
         
-        lithology = pd.Series(index=ml_data.index, dtype='object')
-        for i, cluster in enumerate(clusters):
-            lithology.iloc[i] = f'Facies_{cluster}'
+        lithology = pd.Series(pd.Categorical.from_codes(
+            clusters, categories=[f'Facies_{i}' for i in range(optimal_k)]), index=idx)
         
-        print(f"\nMachine Learning Clustering (K={optimal_k}):")
-        for lith, count in lithology.value_counts().items():
-            percentage = (count / len(lithology)) * 100
-            print(f"  {lith}: {percentage:.1f}%")
+        print(f"\nMachine Learning Clustering (K={optimal_k}):", file=out)
+        self._print_lith_dist(lithology, out=out)
         
         return {
             'lithology': lithology,
@@ -324,6 +412,17 @@ class PetrophysicalAnalyzer:
             'features': analysis_curves
         }
     
+    def _print_lith_dist(self, lithology, indent='  ', out=None):
+        """Print percentage per category from the categorical codes."""
+        cat = lithology.cat
+        codes = cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(cat.categories))
+        total = counts.sum()
+        if total == 0:
+            return
+        for name, count in zip(cat.categories, counts):
+            print(f"{indent}{name}: {count / total * 100:.1f}%", file=out)
+    
     def petrophysical_calculations(self):
         """Advanced petrophysical property calculations."""
         print("\n📊 PETROPHYSICAL CALCULATIONS")
@@ -332,11 +431,11 @@ class PetrophysicalAnalyzer:
         results = {}
         
         # Porosity calculations
-        if 'NPRL' in self.df.columns and 'DEN' in self.df.columns:
+        if 'NPRL' in self._col_set and 'DEN' in self._col_set:
             results['porosity'] = self._calculate_porosity()
         
         # Water saturation (Archie's equation)
-        if 'RTAT' in self.df.columns and 'porosity' in results:
+        if 'RTAT' in self._col_set and 'porosity' in results:
             results['water_saturation'] = self._calculate_water_saturation(results['porosity'])
         
         # Permeability estimation
@@ -344,37 +443,45 @@ class PetrophysicalAnalyzer:
             results['permeability'] = self._estimate_permeability(results['porosity'])
         
         # Net-to-gross calculation
-        if 'GGCE' in self.df.columns:
+        if 'GGCE' in self._col_set:
             results['net_to_gross'] = self._calculate_net_to_gross()
         
         return results
     
     def _calculate_porosity(self):
         """Calculate porosity from neutron and density logs."""
-        nphi = self.df['NPRL'] / 100 if 'NPRL' in self.df.columns else None
-        rhob = self.df['DEN'] if 'DEN' in self.df.columns else None
-        
-        if nphi is None or rhob is None:
+        if 'NPRL' not in self._col_set or 'DEN' not in self._col_set:
             return None
         
+        index = self.df.index
+        nphi = self.df['NPRL'].to_numpy()
+        rhob = self.df['DEN'].to_numpy()
+        
         # Matrix densities (can be depth-dependent based on lithology)
         rho_matrix = 2.65  # Sandstone default
         rho_fluid = 1.0    # Water
         
         # Density porosity
         phi_density = (rho_matrix - rhob) / (rho_matrix - rho_fluid)
-        phi_density = phi_density.clip(0, 0.5)  # Reasonable limits
+        np.clip(phi_density, 0, 0.5, out=phi_density)  # Reasonable limits
         
-        # Neutron porosity (already in fraction)
-        phi_neutron = nphi.clip(0, 0.5)
+        # Neutron porosity (converted to fraction)
+        phi_neutron = nphi / 100
+        np.clip(phi_neutron, 0, 0.5, out=phi_neutron)
         
         # Combined porosity (average, with gas correction)
-        phi_combined = (phi_density + phi_neutron) / 2
+        phi_combined = phi_density + phi_neutron
+        phi_combined /= 2
         
         # Gas effect correction (when neutron < density)
         gas_flag = phi_neutron < (phi_density - 0.04)
-        phi_corrected = phi_combined.copy()
-        phi_corrected[gas_flag] = phi_density[gas_flag]  # Use density porosity for gas zones
+        phi_corrected = np.where(gas_flag, phi_density, phi_combined)  # Use density porosity for gas zones
+        
+        phi_density = pd.Series(phi_density, index=index)
+        phi_neutron = pd.Series(phi_neutron, index=index)
+        phi_combined = pd.Series(phi_combined, index=index)
+        phi_corrected = pd.Series(phi_corrected, index=index)
+        gas_flag = pd.Series(gas_flag, index=index)
         
         print("Porosity Analysis:")
         print(f"  Average density porosity: {phi_density.mean():.3f} ({phi_density.mean()*100:.1f}%)")
@@ -392,7 +499,7 @@ class PetrophysicalAnalyzer:
     
     def _calculate_water_saturation(self, porosity_data):
         """Calculate water saturation using Archie's equation."""
-        if 'RTAT' not in self.df.columns:
+        if 'RTAT' not in self._col_set:
             return None
         
         rt = self.df['RTAT']  # True resistivity
@@ -429,16 +536,25 @@ class PetrophysicalAnalyzer:
     
     def _estimate_permeability(self, porosity_data):
         """Estimate permeability using empirical correlations."""
-        phi = porosity_data['phi_corrected']
+        index = porosity_data['phi_corrected'].index
+        phi = porosity_data['phi_corrected'].to_numpy()
+        one_minus_phi_sq = (1 - phi)**2
         
         # Kozeny-Carman equation (modified)
-        k_kozeny = 5000 * (phi**3) / ((1-phi)**2)  # mD
+        k_kozeny = 5000 * phi**3
+        k_kozeny /= one_minus_phi_sq  # mD
         
         # Timur correlation
-        k_timur = 0.136 * (phi**4.4) / (1 - phi)**2  # mD
+        k_timur = 0.136 * phi**4.4
+        k_timur /= one_minus_phi_sq  # mD
         
         # Average of methods
-        k_average = (k_kozeny + k_timur) / 2
+        k_average = np.add(k_kozeny, k_timur)
+        k_average *= 0.5
+        
+        k_kozeny = pd.Series(k_kozeny, index=index)
+        k_timur = pd.Series(k_timur, index=index)
+        k_average = pd.Series(k_average, index=index)
         
         print(f"\nPermeability Estimation:")
         print(f"  Kozeny-Carman average: {k_kozeny.mean():.1f} mD")
@@ -453,7 +569,7 @@ class PetrophysicalAnalyzer:
     
     def _calculate_net_to_gross(self):
         """Calculate net-to-gross ratio based on gamma ray."""
-        if 'GGCE' not in self.df.columns:
+        if 'GGCE' not in self._col_set:
             return None
         
         gr = self.df['GGCE']
@@ -498,8 +614,6 @@ class PetrophysicalAnalyzer:
         # Figure 4: Depth track with interpretation
         if results:
             self._plot_interpretation_track(results)
-        
-        plt.show()
     
     def _plot_well_logs(self):
         """Create standard well log display."""
@@ -513,7 +627,7 @@ class PetrophysicalAnalyzer:
             'DEN': {'color': 'red', 'scale': 'linear'}
         }
         
-        available_curves = [c for c in curve_configs.keys() if c in self.df.columns]
+        available_curves = [c for c in curve_configs.keys() if c in self._col_set]
         
         if not available_curves:
             print("No key curves available for plotting")
@@ -547,6 +661,7 @@ class PetrophysicalAnalyzer:
         plt.suptitle(f"Well Log Display - Murphy #1", fontsize=14, fontweight='bold')
         plt.tight_layout()
         plt.savefig('/Users/reuben/well/well_logs_display.png', dpi=300, bbox_inches='tight')
+        plt.close(fig)  # Free the 300-dpi figure once it is on disk
         print("✅ Well logs plot saved as 'well_logs_display.png'")
     
     def _plot_crossplots(self):
@@ -554,45 +669,53 @@ class PetrophysicalAnalyzer:
         fig, axes = plt.subplots(2, 2, figsize=(12, 10))
         
         # Neutron-Density crossplot
-        if 'NPRL' in self.df.columns and 'DEN' in self.df.columns:
+        if 'NPRL' in self._col_set and 'DEN' in self._col_set:
             valid_data = self.df[['NPRL', 'DEN']].dropna()
-            if len(valid_data) > 0:
+            if len(valid_data) > 20000:
+                # Bin dense logs instead of drawing every sample
+                hexbin = axes[0,0].hexbin(valid_data['NPRL'], valid_data['DEN'],
+                                          gridsize=80, bins='log', cmap='viridis')
+                plt.colorbar(hexbin, ax=axes[0,0], label='Count (log)')
+            elif len(valid_data) > 0:
                 scatter = axes[0,0].scatter(valid_data['NPRL'], valid_data['DEN'], 
-                                         c=valid_data.index, cmap='viridis', alpha=0.6, s=10)
+                                         c=valid_data.index, cmap='viridis', alpha=0.6, s=10,
+                                         rasterized=True)
+                plt.colorbar(scatter, ax=axes[0,0], label='Depth (ft)')
+            if len(valid_data) > 0:
                 axes[0,0].set_xlabel('Neutron Porosity (%)')
                 axes[0,0].set_ylabel('Bulk Density (g/cc)')
                 axes[0,0].set_title('Neutron-Density Cross-plot')
                 axes[0,0].grid(True, alpha=0.3)
-                plt.colorbar(scatter, ax=axes[0,0], label='Depth (ft)')
         
         # PE vs Density
-        if 'PDPE' in self.df.columns and 'DEN' in self.df.columns:
+        if 'PDPE' in self._col_set and 'DEN' in self._col_set:
             valid_data = self.df[['PDPE', 'DEN']].dropna()
             if len(valid_data) > 0:
                 scatter = axes[0,1].scatter(valid_data['PDPE'], valid_data['DEN'], 
-                                         c=valid_data.index, cmap='plasma', alpha=0.6, s=10)
+                                         c=valid_data.index, cmap='plasma', alpha=0.6, s=10,
+                                         rasterized=True)
                 axes[0,1].set_xlabel('PE (b/e)')
                 axes[0,1].set_ylabel('Bulk Density (g/cc)')
                 axes[0,1].set_title('PE-Density Cross-plot')
                 axes[0,1].grid(True, alpha=0.3)
         
         # Resistivity vs Porosity
-        if 'RTAT' in self.df.columns and 'NPRL' in self.df.columns:
+        if 'RTAT' in self._col_set and 'NPRL' in self._col_set:
             valid_data = self.df[['RTAT', 'NPRL']].dropna()
             if len(valid_data) > 0:
                 axes[1,0].loglog(valid_data['RTAT'], valid_data['NPRL'], 
-                               'o', alpha=0.6, markersize=3)
+                               'o', alpha=0.6, markersize=3, rasterized=True)
                 axes[1,0].set_xlabel('Resistivity (ohm-m)')
                 axes[1,0].set_ylabel('Neutron Porosity (%)')
                 axes[1,0].set_title('Resistivity-Porosity Cross-plot')
                 axes[1,0].grid(True, alpha=0.3)
         
         # GR vs SP
-        if 'GGCE' in self.df.columns and 'SPCG' in self.df.columns:
+        if 'GGCE' in self._col_set and 'SPCG' in self._col_set:
             valid_data = self.df[['GGCE', 'SPCG']].dropna()
             if len(valid_data) > 0:
                 axes[1,1].scatter(valid_data['GGCE'], valid_data['SPCG'], 
-                                alpha=0.6, s=10)
+                                alpha=0.6, s=10, rasterized=True)
                 axes[1,1].set_xlabel('Gamma Ray (GAPI)')
                 axes[1,1].set_ylabel('SP (mV)')
                 axes[1,1].set_title('GR-SP Cross-plot')
@@ -601,12 +724,13 @@ class PetrophysicalAnalyzer:
         plt.suptitle('Petrophysical Cross-plots', fontsize=14, fontweight='bold')
         plt.tight_layout()
         plt.savefig('/Users/reuben/well/crossplots_analysis.png', dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print("✅ Cross-plots saved as 'crossplots_analysis.png'")
     
     def _plot_histograms(self):
         """Create histogram analysis of key parameters."""
         key_curves = ['GGCE', 'NPRL', 'DEN', 'RTAT']
-        available_curves = [c for c in key_curves if c in self.df.columns]
+        available_curves = [c for c in key_curves if c in self._col_set]
         
         if not available_curves:
             return
@@ -616,11 +740,15 @@ class PetrophysicalAnalyzer:
         axes = axes.flatten()
         
         for i, curve in enumerate(available_curves[:4]):
-            data = self.df[curve].dropna()
+            data = self.df[curve].to_numpy()
+            data = data[~np.isnan(data)]
             if len(data) == 0:
                 continue
             
-            axes[i].hist(data, bins=50, alpha=0.7, edgecolor='black', linewidth=0.5)
+            # Bin once with NumPy and draw the precomputed counts
+            counts, edges = np.histogram(data, bins=50)
+            axes[i].hist(edges[:-1], bins=edges, weights=counts,
+                         alpha=0.7, edgecolor='black', linewidth=0.5)
             axes[i].set_xlabel(f"{curve}")
             axes[i].set_ylabel("Frequency")
             axes[i].set_title(f"{curve} Distribution")
@@ -628,7 +756,7 @@ class PetrophysicalAnalyzer:
             
             # Add statistics
             mean_val = data.mean()
-            std_val = data.std()
+            std_val = data.std(ddof=1)
             axes[i].axvline(mean_val, color='red', linestyle='--', 
                            label=f'Mean: {mean_val:.2f}')
             axes[i].axvline(mean_val + std_val, color='orange', linestyle='--', alpha=0.7)
@@ -638,13 +766,14 @@ class PetrophysicalAnalyzer:
         plt.suptitle('Log Data Distributions', fontsize=14, fontweight='bold')
         plt.tight_layout()
         plt.savefig('/Users/reuben/well/histograms_analysis.png', dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print("✅ Histograms saved as 'histograms_analysis.png'")
     
     def _plot_interpretation_track(self, results):
         """Create interpretation summary track."""
         fig, axes = plt.subplots(1, 4, figsize=(16, 12), sharey=True)
         
-        depth = self.df.index
+        depth = self._depth
         
         # Track 1: Lithology
         if 'gamma_ray' in results and results['gamma_ray']:
@@ -667,7 +796,16 @@ class PetrophysicalAnalyzer:
         if 'porosity' in results and results['porosity']:
             phi = results['porosity']['phi_corrected'] * 100
             axes[1].plot(phi, phi.index, 'blue', linewidth=1)
-            axes[1].fill_betweenx(phi.index, 0, phi, alpha=0.3, color='blue')
+            
+            # Shade by reservoir-quality class
+            quality = _classify_porosity(results['porosity']['phi_corrected'].to_numpy())
+            quality_colors = {'Excellent': 'green', 'Good': 'yellowgreen', 'Fair': 'orange', 'Poor': 'red'}
+            for label, color in quality_colors.items():
+                mask = quality == label
+                if mask.any():
+                    axes[1].fill_betweenx(phi.index, 0, phi, where=mask,
+                                          alpha=0.3, color=color, label=label)
+            axes[1].legend(loc='upper right')
             axes[1].set_xlim(0, max(30, phi.max()))
         
         axes[1].set_xlabel("Porosity (%)")
@@ -703,82 +841,87 @@ class PetrophysicalAnalyzer:
         plt.suptitle('Petrophysical Interpretation Summary', fontsize=14, fontweight='bold')
         plt.tight_layout()
         plt.savefig('/Users/reuben/well/interpretation_summary.png', dpi=300, bbox_inches='tight')
+        plt.close(fig)
         print("✅ Interpretation summary saved as 'interpretation_summary.png'")
     
-    def generate_report(self, results):
-        """Generate comprehensive analysis report."""
+    def generate_report(self, results, out_path=_DEFAULT_REPORT):
+        """Generate comprehensive analysis report and save it to out_path."""
         print("\n📋 GENERATING ANALYSIS REPORT")
         print("="*50)
         
-        report_content = []
-        report_content.append("# MURPHY #1 WELL LOG ANALYSIS REPORT")
-        report_content.append("=" * 50)
-        report_content.append(f"Analysis Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_content.append(f"LAS File: {self.las_file_path}")
+        # Pull each summarised curve out as a raw array once
+        phi = sw = k = None
+        if 'porosity' in results and results['porosity']:
+            phi = results['porosity']['phi_corrected'].to_numpy()
+        if 'water_saturation' in results and results['water_saturation']:
+            sw = results['water_saturation']['sw'].to_numpy()
+        if 'permeability' in results and results['permeability']:
+            k = results['permeability']['k_average'].to_numpy()
+        
+        buf = io.StringIO()
+        w = buf.write
+        w("# MURPHY #1 WELL LOG ANALYSIS REPORT\n")
+        w("=" * 50 + "\n")
+        w(f"Analysis Date: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        w(f"LAS File: {self.las_file_path}\n")
         
         # Well Information
-        report_content.append("\n## WELL INFORMATION")
-        report_content.append("-" * 30)
+        w("\n## WELL INFORMATION\n")
+        w("-" * 30 + "\n")
         if self.well_info:
             for key, value in self.well_info.items():
-                report_content.append(f"{key}: {value}")
+                w(f"{key}: {value}\n")
         
         # Data Summary
-        report_content.append("\n## DATA SUMMARY")
-        report_content.append("-" * 30)
-        report_content.append(f"Depth Range: {self.df.index.min():.1f} - {self.df.index.max():.1f} ft")
-        report_content.append(f"Total Points: {len(self.df):,}")
-        report_content.append(f"Available Curves: {len(self.df.columns)}")
+        w("\n## DATA SUMMARY\n")
+        w("-" * 30 + "\n")
+        w(f"Depth Range: {self._depth_min:.1f} - {self._depth_max:.1f} ft\n")
+        w(f"Total Points: {len(self.df):,}\n")
+        w(f"Available Curves: {len(self.df.columns)}\n")
         
         # Lithology Summary
         if 'gamma_ray' in results and results['gamma_ray']:
-            report_content.append("\n## LITHOLOGY ANALYSIS")
-            report_content.append("-" * 30)
+            w("\n## LITHOLOGY ANALYSIS\n")
+            w("-" * 30 + "\n")
             lith_dist = results['gamma_ray']['lithology'].value_counts()
             for lith, count in lith_dist.items():
                 percentage = (count / lith_dist.sum()) * 100
-                report_content.append(f"{lith}: {percentage:.1f}%")
+                w(f"{lith}: {percentage:.1f}%\n")
         
         # Petrophysical Summary
-        if 'porosity' in results and results['porosity']:
-            report_content.append("\n## PETROPHYSICAL PROPERTIES")
-            report_content.append("-" * 30)
-            phi_avg = results['porosity']['phi_corrected'].mean() * 100
-            report_content.append(f"Average Porosity: {phi_avg:.1f}%")
+        if phi is not None:
+            # Means and quality-class counts in a single pass
+            phi_avg, counts, sw_avg, k_avg = _summarize(phi, sw, k)
+            
+            w("\n## PETROPHYSICAL PROPERTIES\n")
+            w("-" * 30 + "\n")
+            w(f"Average Porosity: {phi_avg*100:.1f}%\n")
             
-            if 'water_saturation' in results and results['water_saturation']:
-                sw_avg = results['water_saturation']['sw'].mean() * 100
-                report_content.append(f"Average Water Saturation: {sw_avg:.1f}%")
-                report_content.append(f"Average Hydrocarbon Saturation: {100-sw_avg:.1f}%")
+            if sw is not None:
+                sw_avg *= 100
+                w(f"Average Water Saturation: {sw_avg:.1f}%\n")
+                w(f"Average Hydrocarbon Saturation: {100-sw_avg:.1f}%\n")
             
-            if 'permeability' in results and results['permeability']:
-                k_avg = results['permeability']['k_average'].mean()
-                report_content.append(f"Average Permeability: {k_avg:.1f} mD")
+            if k is not None:
+                w(f"Average Permeability: {k_avg:.1f} mD\n")
         
         # Reservoir Quality
-        report_content.append("\n## RESERVOIR QUALITY ASSESSMENT")
-        report_content.append("-" * 30)
+        w("\n## RESERVOIR QUALITY ASSESSMENT\n")
+        w("-" * 30 + "\n")
         
-        if 'porosity' in results and results['porosity']:
-            phi_data = results['porosity']['phi_corrected'] * 100
-            
-            excellent = (phi_data > 15).sum()
-            good = ((phi_data > 10) & (phi_data <= 15)).sum()
-            fair = ((phi_data > 5) & (phi_data <= 10)).sum()
-            poor = (phi_data <= 5).sum()
-            total = len(phi_data)
-            
-            report_content.append(f"Excellent (>15%): {excellent/total*100:.1f}%")
-            report_content.append(f"Good (10-15%): {good/total*100:.1f}%")
-            report_content.append(f"Fair (5-10%): {fair/total*100:.1f}%")
-            report_content.append(f"Poor (<5%): {poor/total*100:.1f}%")
+        if phi is not None:
+            # Classes: (-inf, 5], (5, 10], (10, 15], (15, inf) %; percentages of all samples
+            w(_QUAL_TEMPLATE.format(*(counts[::-1] / phi.size * 100)))
         
         # Write report to file
-        report_text = "\n".join(report_content)
-        with open('/Users/reuben/well/Murphy1_Analysis_Report.txt', 'w') as f:
+        report_text = buf.getvalue()
+        # Write beside the target and rename, so readers never see a partial report
+        tmp_path = os.fspath(out_path) + '.tmp'
+        with open(tmp_path, 'w') as f:
             f.write(report_text)
+        os.replace(tmp_path, out_path)
         
-        print("✅ Analysis report saved as 'Murphy1_Analysis_Report.txt'")
+        print(f"✅ Analysis report saved as '{os.path.basename(out_path)}'")
         return report_text
 
 def main():
@@ -4,11 +4,46 @@ PDF to Markdown Converter for Well Data Analysis
 Extracts text, tables, and structure from PDF files and converts to markdown.
 """
 
+import os
 import pdfplumber
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+# Paragraph break: a blank line, possibly containing whitespace
+_PARA_RE = re.compile(r'\n\s*\n')
+
+# pdfminer issues many small reads (and the markdown is written in many small blocks);
+# a large buffer coalesces them on slow/network storage
+IO_BUFFER_SIZE = 1 << 20
+
+# Below this many pages the process pool's start-up cost outweighs the gain
+PARALLEL_MIN_PAGES = 8
+
+def _read_page(page):
+    """Extract stripped text and non-empty tables from a single page."""
+    # Extract text
+    text = page.extract_text()
+    text = text.strip() if text else ''
+    
+    # Extract tables, skipping empty ones (including all-blank grids) once here.
+    # The default table finder builds cells from ruling lines/rects/curves, so a page
+    # without any cannot yield a table and the layout analysis is skipped.
+    if not (page.lines or page.rects or page.curves):
+        return text, []
+    tables = [table for table in page.extract_tables()
+              if table and any(any(cell for cell in row) for row in table)]
+    
+    return text, tables
+
+def _extract_page(pdf_path, page_no):
+    """Worker: re-open the PDF and extract one (1-based) page."""
+    with open(pdf_path, 'rb', buffering=IO_BUFFER_SIZE) as fh, pdfplumber.open(fh) as pdf:
+        text, tables = _read_page(pdf.pages[page_no - 1])
+    return page_no, text, tables
+
 def extract_pdf_content(pdf_path):
     """Extract structured content from PDF file."""
     content = {
@@ -18,96 +53,91 @@ def extract_pdf_content(pdf_path):
         'metadata': {}
     }
     
-    with pdfplumber.open(pdf_path) as pdf:
-        # Extract metadata
-        content['metadata'] = pdf.metadata or {}
+    with open(pdf_path, 'rb', buffering=IO_BUFFER_SIZE) as fh, pdfplumber.open(fh) as pdf:
+        # Extract metadata, keeping only populated fields
+        content['metadata'] = {key: value for key, value in (pdf.metadata or {}).items() if value}
+        n_pages = len(pdf.pages)
+        workers = min(os.cpu_count() or 1, n_pages)
+        parallel = n_pages >= PARALLEL_MIN_PAGES and workers > 1
         
-        for page_num, page in enumerate(pdf.pages, 1):
-            page_content = {
-                'page_number': page_num,
-                'text': '',
-                'tables': []
-            }
-            
-            # Extract text
-            text = page.extract_text()
-            if text:
-                page_content['text'] = text.strip()
-            
-            # Extract tables
-            tables = page.extract_tables()
-            if tables:
-                for table in tables:
-                    if table:  # Skip empty tables
-                        page_content['tables'].append(table)
-            
-            content['pages'].append(page_content)
+        if not parallel:
+            results = [(page_num, *_read_page(page))
+                       for page_num, page in enumerate(pdf.pages, 1)]
+    
+    if parallel:
+        # Pages are independent and pdfminer is CPU-bound, so fan out to processes;
+        # executor.map yields results in page order
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_extract_page, repeat(pdf_path), range(1, n_pages + 1)))
+    
+    for page_num, text, tables in results:
+        content['pages'].append({
+            'page_number': page_num,
+            'text': text,
+            'tables': tables
+        })
     
     return content
 
 def format_table_as_markdown(table):
-    """Convert table to markdown format."""
-    if not table or not any(table):
-        return ""
-    
-    markdown_table = []
+    """Convert table to markdown format (tables are non-empty after extraction)."""
+    def cells(row):
+        return " | ".join("" if c is None else c if type(c) is str else str(c) for c in row)
     
     # Header row
-    if table[0]:
-        header = "| " + " | ".join(str(cell or "") for cell in table[0]) + " |"
-        separator = "| " + " | ".join("---" for _ in table[0]) + " |"
-        markdown_table.extend([header, separator])
+    header = table[0]
+    head = ""
+    if header:
+        head = "| " + cells(header) + " |\n| " + " | ".join(["---"] * len(header)) + " |"
     
     # Data rows
-    for row in table[1:]:
-        if row:
-            row_text = "| " + " | ".join(str(cell or "") for cell in row) + " |"
-            markdown_table.append(row_text)
+    body = "\n".join("| " + cells(row) + " |" for row in table[1:] if row)
     
-    return "\n".join(markdown_table)
+    if head and body:
+        return head + "\n" + body
+    return head or body
 
-def convert_to_markdown(content, pdf_name):
-    """Convert extracted content to markdown format."""
-    markdown_lines = []
-    
+def iter_markdown(content, pdf_name):
+    """Yield the markdown for extracted content as blank-line separated blocks."""
     # Title
     title = content['metadata'].get('title', pdf_name.replace('.pdf', ''))
-    markdown_lines.append(f"# {title}\n")
+    yield f"# {title}"
     
     # Metadata section
     if content['metadata']:
-        markdown_lines.append("## Document Metadata\n")
-        for key, value in content['metadata'].items():
-            if value:
-                markdown_lines.append(f"- **{key}**: {value}")
-        markdown_lines.append("")
+        yield "## Document Metadata"
+        yield "\n".join(f"- **{key}**: {value}" for key, value in content['metadata'].items())
     
     # Process each page
     for page in content['pages']:
         if page['text'] or page['tables']:
-            markdown_lines.append(f"## Page {page['page_number']}\n")
+            yield f"## Page {page['page_number']}"
             
             if page['text']:
-                # Clean up text formatting
-                text = page['text']
                 # Split into paragraphs and clean up
-                paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-                
-                for paragraph in paragraphs:
+                for paragraph in filter(None, map(str.strip, _PARA_RE.split(page['text']))):
                     # Handle potential headers (lines that are short and in caps)
                     if len(paragraph) < 100 and paragraph.isupper():
-                        markdown_lines.append(f"### {paragraph}\n")
+                        yield f"### {paragraph}"
                     else:
-                        markdown_lines.append(f"{paragraph}\n")
+                        yield paragraph
             
             # Add tables
             if page['tables']:
                 for i, table in enumerate(page['tables'], 1):
-                    markdown_lines.append(f"### Table {i}\n")
-                    markdown_lines.append(format_table_as_markdown(table))
-                    markdown_lines.append("")
-    
-    return "\n".join(markdown_lines)
+                    yield f"### Table {i}"
+                    yield format_table_as_markdown(table)
+
+def convert_to_markdown(content, pdf_name):
+    """Convert extracted content to markdown format."""
+    return "\n\n".join(iter_markdown(content, pdf_name)) + "\n"
+
+def write_markdown(content, pdf_name, out):
+    """Stream the markdown to an open text file without building it in memory."""
+    blocks = iter_markdown(content, pdf_name)
+    out.write(next(blocks))  # the title is always present
+    out.writelines("\n\n" + block for block in blocks)
+    out.write("\n")
 
 def main():
     if len(sys.argv) != 2:
@@ -125,12 +155,10 @@ def main():
         # Extract content
         content = extract_pdf_content(pdf_path)
         
-        # Convert to markdown
-        markdown = convert_to_markdown(content, pdf_path.name)
-        
-        # Write to output file
+        # Convert to markdown, streaming it to the output file
         output_path = pdf_path.with_suffix('.md')
-        output_path.write_text(markdown)
+        with output_path.open('w', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+            write_markdown(content, pdf_path.name, f)
         
         print(f"Successfully converted to {output_path}")
         print(f"Processed {len(content['pages'])} pages")